@@ -1,8 +1,17 @@
+import io
+
 import streamlit as st
-import random
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional; the kernel also runs as a plain Python loop
+    _HAVE_NUMBA = False
+    prange = range
+
 st.set_page_config(
     page_title="Battery Cell Analyzer",
     page_icon="🔋",
@@ -10,7 +19,7 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
+_CSS_BLOCK = """
 <style>
     .main-header {
         text-align: center;
@@ -50,33 +59,116 @@ st.markdown("""
         background-color: #f8f9fa;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+_HEADER_HTML = """
+<div class="main-header">
+    <h1>🔋 Battery Cell Analyzer</h1>
+    <p>Configure your battery cells and analyze their performance</p>
+</div>
+"""
+
+_WELCOME_MD = """
+## 📖 How to Use
+
+1. **Configure Cells**: Use the sidebar to set up your battery cells
+2. **Select Cell Types**: Choose between LFP (Lithium Iron Phosphate) and MNC (Lithium Manganese Cobalt)
+3. **Set Current Values**: Enter the current for each cell in Amperes
+4. **Analyze**: Click the 'Analyze Cells' button to process your data
+5. **Review Results**: View detailed analysis including voltage, temperature, and capacity calculations
+
+## 🔋 Cell Type Information
+
+<div style="display: flex; gap: 2rem;">
+    <div style="flex: 1;">
+        <h3>LFP (Lithium Iron Phosphate)</h3>
+        <ul>
+            <li><strong>Nominal Voltage</strong>: 3.2V</li>
+            <li><strong>Voltage Range</strong>: 2.8V - 4.0V</li>
+            <li><strong>Characteristics</strong>: Stable, long-lasting, safer chemistry</li>
+        </ul>
+    </div>
+    <div style="flex: 1;">
+        <h3>MNC (Lithium Manganese Cobalt)</h3>
+        <ul>
+            <li><strong>Nominal Voltage</strong>: 3.6V</li>
+            <li><strong>Voltage Range</strong>: 3.2V - 3.4V</li>
+            <li><strong>Characteristics</strong>: Higher energy density, good performance</li>
+        </ul>
+    </div>
+</div>
+"""
+
+st.markdown(_CSS_BLOCK, unsafe_allow_html=True)
+
+# Nominal, max, and min voltage per cell chemistry, keyed by canonical type name
+_CELL_SPECS = {
+    "LFP": (3.2, 4.0, 2.8),
+    "MNC": (3.6, 3.4, 3.2)
+}
+
+# Row of (nominal, max, min) voltage per type code, in _CELL_SPECS order
+_SPEC_TABLE = np.array(list(_CELL_SPECS.values()), dtype=np.float64)
+
+# Persistent PCG64 generator, reused across reruns instead of reseeding per call
+_RNG = np.random.default_rng()
+
+def _compute(type_codes, currents):
+    """Pure-numeric kernel: voltage, capacity, and range for int8-coded types"""
+
+    n = type_codes.shape[0]
+    voltage = np.empty(n, dtype=np.float64)
+    max_voltage = np.empty(n, dtype=np.float64)
+    min_voltage = np.empty(n, dtype=np.float64)
+    capacity = np.empty(n, dtype=np.float64)
+    voltage_range_percent = np.empty(n, dtype=np.float64)
+
+    for i in prange(n):
+        code = type_codes[i]
+        v = _SPEC_TABLE[code, 0]
+        v_max = _SPEC_TABLE[code, 1]
+        v_min = _SPEC_TABLE[code, 2]
+        voltage[i] = v
+        max_voltage[i] = v_max
+        min_voltage[i] = v_min
+        capacity[i] = v * currents[i]
+        span = v_max - v_min
+        if span > 0:
+            voltage_range_percent[i] = (v - v_min) / span * 100
+        else:
+            voltage_range_percent[i] = 50.0
+
+    return voltage, max_voltage, min_voltage, capacity, voltage_range_percent
+
+if _HAVE_NUMBA:
+    # Fixed signature so compilation happens at import, cached across reruns
+    _compute = njit(
+        'Tuple((f8[:],f8[:],f8[:],f8[:],f8[:]))(i1[:],f8[:])',
+        parallel=True, fastmath=True, cache=True
+    )(_compute)
+
+def calculate_cells_vectorized(types: np.ndarray, currents: np.ndarray, seed: int = None) -> Dict[str, np.ndarray]:
+    """Calculate battery cell parameters for all cells in one NumPy batch"""
+
+    # Encode types as int8 rows into _SPEC_TABLE; types arrive pre-normalized
+    type_codes = np.select(
+        [types == cell_type for cell_type in _CELL_SPECS],
+        np.arange(len(_CELL_SPECS), dtype=np.int8),
+        default=np.int8(1)
+    ).astype(np.int8)
+
+    voltage, max_voltage, min_voltage, capacity, voltage_range_percent = _compute(
+        type_codes, np.ascontiguousarray(currents, dtype=np.float64)
+    )
+    capacity = capacity.round(2)
+    voltage_range_percent = voltage_range_percent.round(1)
+
+    rng = _RNG if seed is None else np.random.default_rng(seed)
+    temperature = rng.uniform(25.0, 40.0, size=types.size).round(1)
 
-def calculate_cell_parameters(cell_type: str, current: float) -> Dict:
-    """Calculate battery cell parameters based on type and current"""
-    
-    # Voltage based on cell type
-    if cell_type.upper() == "LFP":
-        voltage = 3.2
-        max_voltage = 4.0
-        min_voltage = 2.8
-    else:  # MNC
-        voltage = 3.6
-        max_voltage = 3.4
-        min_voltage = 3.2
-    
-    temperature = round(random.uniform(25, 40), 1)
-    
-    capacity = round(voltage * current, 2)
-    
-    if max_voltage > min_voltage:
-        voltage_range_percent = round(((voltage - min_voltage) / (max_voltage - min_voltage)) * 100, 1)
-    else:
-        voltage_range_percent = 50.0 
-    
     return {
         "voltage": voltage,
-        "current": current,
+        "current": currents,
         "temperature": temperature,
         "capacity": capacity,
         "max_voltage": max_voltage,
@@ -84,102 +176,112 @@ def calculate_cell_parameters(cell_type: str, current: float) -> Dict:
         "voltage_range_percent": voltage_range_percent
     }
 
-def display_cell_result(cell_id: int, cell_type: str, params: Dict):
-    """Display individual cell results in a styled card"""
-    
-    css_class = "mnc" if cell_type.upper() == "MNC" else ""
-    
-    st.markdown(f"""
-    <div class="cell-result {css_class}">
-        <h4>🔋 Cell {cell_id} ({cell_type})</h4>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Voltage", f"{params['voltage']}V")
-        
-    with col2:
-        st.metric("Current", f"{params['current']}A")
-        
-    with col3:
-        st.metric("Temperature", f"{params['temperature']}°C")
-        
-    with col4:
-        st.metric("Capacity", f"{params['capacity']} Wh")
-    
+@st.cache_data
+def build_results_df(cells_tuple: Tuple[Tuple[int, str, float], ...], seed: int = None) -> pd.DataFrame:
+    """Build the results table for a cell configuration, cached across reruns"""
 
-    st.write("**Voltage Range:**")
-    progress_value = max(0.0, min(1.0, params['voltage_range_percent'] / 100))
-    st.progress(progress_value)
-    st.write(f"Range: {params['min_voltage']}V - {params['max_voltage']}V (Current: {params['voltage']}V)")
+    ids, types, currents = zip(*cells_tuple)
+    params = calculate_cells_vectorized(np.asarray(types), np.asarray(currents, dtype=float), seed=seed)
+
+    return pd.DataFrame({
+        "Cell ID": ids,
+        "Type": types,
+        "Voltage (V)": params["voltage"],
+        "Current (A)": params["current"],
+        "Temperature (°C)": params["temperature"],
+        "Capacity (Wh)": params["capacity"],
+        "Min Voltage (V)": params["min_voltage"],
+        "Max Voltage (V)": params["max_voltage"],
+        "Voltage Range (%)": params["voltage_range_percent"]
+    }).astype({
+        # Values fit comfortably in narrow dtypes; less to serialize per rerun
+        "Cell ID": "int8",
+        "Type": pd.CategoricalDtype(list(_CELL_SPECS)),
+        "Voltage (V)": "float32",
+        "Current (A)": "float32",
+        "Temperature (°C)": "float32",
+        "Capacity (Wh)": "float32",
+        "Min Voltage (V)": "float32",
+        "Max Voltage (V)": "float32",
+        "Voltage Range (%)": "float32"
+    })
+
+@st.cache_data
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Encode the results table as CSV, cached across reruns"""
+
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8")
+    return buf.getvalue()
 
 def main():
 
-    st.markdown("""
-    <div class="main-header">
-        <h1>🔋 Battery Cell Analyzer</h1>
-        <p>Configure your battery cells and analyze their performance</p>
-    </div>
-    """, unsafe_allow_html=True)
+    ss = st.session_state
+    ss.setdefault("analyze", False)
+
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
     
     st.sidebar.header("⚙️ Cell Configuration")
     st.sidebar.write("Configure up to 8 battery cells for analysis")
     
-    num_cells = st.sidebar.slider("Number of cells to analyze", 1, 8, 3)
-    
-    cells_data = []
-    
-    st.sidebar.subheader("Cell Settings")
-    
-    for i in range(num_cells):
-        st.sidebar.write(f"**Cell {i+1}**")
-        
-        cell_type = st.sidebar.selectbox(
-            f"Cell {i+1} Type",
-            ["LFP", "MNC"],
-            key=f"type_{i}",
-            help="LFP: Lithium Iron Phosphate, MNC: Lithium Manganese Cobalt"
-        )
-        
-        current = round(st.sidebar.number_input(
-            f"Cell {i+1} Current (A)",
-            min_value=0.1,
-            max_value=10.0,
-            value=2.0,
-            step=0.1,
-            key=f"current_{i}"
-        ),2)
-        
-        cells_data.append({
-            "id": i + 1,
-            "type": cell_type,
-            "current": current
+    with st.sidebar.form("cfg", clear_on_submit=False):
+        num_cells = st.slider("Number of cells to analyze", 1, 8, 3)
+
+        st.subheader("Cell Settings")
+
+        default_df = pd.DataFrame({
+            "Type": ["LFP"] * num_cells,
+            "Current (A)": [2.0] * num_cells
         })
-        
-        st.sidebar.write("---")
-    
-    if st.sidebar.button("🔍 Analyze Cells", type="primary"):
-        st.session_state.analyze = True
-    
-    if hasattr(st.session_state, 'analyze') and st.session_state.analyze:
-        
-        results = []
-        for cell in cells_data:
-            params = calculate_cell_parameters(cell["type"], cell["current"])
-            results.append({
-                "id": cell["id"],
-                "type": cell["type"],
-                **params
-            })
-        
+
+        edited = st.data_editor(
+            default_df,
+            column_config={
+                "Type": st.column_config.SelectboxColumn(
+                    "Type",
+                    options=list(_CELL_SPECS),
+                    required=True,
+                    help="LFP: Lithium Iron Phosphate, MNC: Lithium Manganese Cobalt"
+                ),
+                "Current (A)": st.column_config.NumberColumn(
+                    "Current (A)",
+                    min_value=0.1,
+                    max_value=10.0,
+                    step=0.1,
+                    required=True
+                )
+            },
+            num_rows="fixed",
+            hide_index=True,
+            key="cells_editor"
+        )
+
+        submitted = st.form_submit_button("🔍 Analyze Cells", type="primary")
+
+    cells_tuple = tuple(zip(
+        range(1, len(edited) + 1),
+        edited["Type"],
+        edited["Current (A)"].round(2)
+    ))
+
+    if submitted:
+        ss.analyze = True
+
+    if ss.analyze:
+
+        df = build_results_df(cells_tuple, seed=ss.get("seed"))
+
         st.header("📊 Analysis Summary")
-        
-        total_capacity = sum(result["capacity"] for result in results)
-        avg_temperature = round(sum(result["temperature"] for result in results) / len(results), 1)
-        peak_voltage = max(result["voltage"] for result in results)
-        cell_count = len(results)
+
+        aggs = df.agg({
+            "Capacity (Wh)": "sum",
+            "Temperature (°C)": "mean",
+            "Voltage (V)": "max"
+        })
+        total_capacity = round(float(aggs["Capacity (Wh)"]), 2)
+        avg_temperature = round(float(aggs["Temperature (°C)"]), 1)
+        peak_voltage = round(float(aggs["Voltage (V)"]), 1)
+        cell_count = len(df)
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -198,30 +300,19 @@ def main():
         st.write("---")
         
         st.header("🔋 Individual Cell Results")
-        
-        for result in results:
-            display_cell_result(result["id"], result["type"], result)
-            st.write("")
-        
-        st.header("📋 Data Table")
-        
-        df_data = []
-        for result in results:
-            df_data.append({
-                "Cell ID": result["id"],
-                "Type": result["type"],
-                "Voltage (V)": result["voltage"],
-                "Current (A)": result["current"],
-                "Temperature (°C)": result["temperature"],
-                "Capacity (Wh)": result["capacity"],
-                "Min Voltage (V)": result["min_voltage"],
-                "Max Voltage (V)": result["max_voltage"]
-            })
-        
-        df = pd.DataFrame(df_data)
-        st.dataframe(df, use_container_width=True)
-        
-        csv = df.to_csv(index=False)
+
+        styled = df.style.format({
+            "Voltage (V)": "{:.1f}",
+            "Current (A)": "{:.2f}",
+            "Temperature (°C)": "{:.1f}",
+            "Capacity (Wh)": "{:.2f}",
+            "Min Voltage (V)": "{:.1f}",
+            "Max Voltage (V)": "{:.1f}",
+            "Voltage Range (%)": "{:.1f}"
+        }).bar(subset=["Voltage Range (%)"], vmin=0, vmax=100, color="#667eea")
+        st.dataframe(styled, use_container_width=True)
+
+        csv = to_csv_bytes(df)
         st.download_button(
             label="📥 Download Results as CSV",
             data=csv,
@@ -231,7 +322,11 @@ def main():
         
         st.header("📈 Cell Type Distribution")
         
-        type_counts = df["Type"].value_counts()
+        type_codes = df["Type"].cat.codes.to_numpy()
+        type_counts = pd.Series(
+            np.bincount(type_codes, minlength=len(_CELL_SPECS)),
+            index=list(_CELL_SPECS)
+        )
         st.bar_chart(type_counts)
         
         st.header("⚡ Capacity Comparison")
@@ -241,36 +336,8 @@ def main():
         
     else:
         st.info("👈 Configure your battery cells in the sidebar and click 'Analyze Cells' to get started!")
-        
-        st.header("📖 How to Use")
-        
-        st.write("""
-        1. **Configure Cells**: Use the sidebar to set up your battery cells
-        2. **Select Cell Types**: Choose between LFP (Lithium Iron Phosphate) and MNC (Lithium Manganese Cobalt)
-        3. **Set Current Values**: Enter the current for each cell in Amperes
-        4. **Analyze**: Click the 'Analyze Cells' button to process your data
-        5. **Review Results**: View detailed analysis including voltage, temperature, and capacity calculations
-        """)
-        
-        st.header("🔋 Cell Type Information")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("LFP (Lithium Iron Phosphate)")
-            st.write("""
-            - **Nominal Voltage**: 3.2V
-            - **Voltage Range**: 2.8V - 4.0V
-            - **Characteristics**: Stable, long-lasting, safer chemistry
-            """)
-            
-        with col2:
-            st.subheader("MNC (Lithium Manganese Cobalt)")
-            st.write("""
-            - **Nominal Voltage**: 3.6V
-            - **Voltage Range**: 3.2V - 3.4V
-            - **Characteristics**: Higher energy density, good performance
-            """)
+
+        st.markdown(_WELCOME_MD, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()